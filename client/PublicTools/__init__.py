@@ -14,17 +14,19 @@
     - ExcelProcessor: Excel文件处理
     - ConfigValidator: 配置文件验证
     - logger: 日志系统
+    - json_codec: JSON编解码（优先使用orjson）
 """
 
 from .AllEventsHandler import AllEventsHandler
 from .log import logger
-from .id_generator import generate_id
+from .id_generator import generate_id, generate_ids
 
 # 导出所有可用的符号
 __all__ = [
     'AllEventsHandler',
     'logger',
     'generate_id',
+    'generate_ids',
 ]
 
 # 版本信息
@@ -2,10 +2,17 @@
 """
 UUID ID 生成工具
 
-基于 Python 标准库 uuid 模块，提供简洁的 ID 生成功能。
+优先使用 uuid_utils（Rust 实现），未安装时回退到 Python 标准库 uuid 模块，
+提供简洁的 ID 生成功能。
 """
 
-import uuid
+import os
+import binascii
+
+try:
+    from uuid_utils import uuid4 as _uuid4
+except ImportError:
+    from uuid import uuid4 as _uuid4
 
 
 def generate_id(with_hyphen=True, uppercase=False):
@@ -21,12 +28,40 @@ def generate_id(with_hyphen=True, uppercase=False):
     返回:
         str: 生成的 UUID 字符串
     """
-    result = str(uuid.uuid4())
+    u = _uuid4()
+    # hex 本身不含横杠，无需再 replace
+    result = str(u) if with_hyphen else u.hex
+
+    return result.upper() if uppercase else result
+
+
+def generate_ids(n, with_hyphen=True, uppercase=False):
+    """
+    批量生成 n 个 UUID v4 随机唯一标识符
+
+    一次性读取 16*n 字节随机数后按 16 字节切片，避免逐个调用 uuid4()
+    的系统调用和 UUID 对象构造开销。
 
-    if not with_hyphen:
-        result = result.replace("-", "")
+    参数:
+        n (int): 生成数量
+        with_hyphen (bool): 是否保留横杠，默认 True
+        uppercase (bool): 是否转为大写，默认 False
+
+    返回:
+        list[str]: 生成的 UUID 字符串列表
+    """
+    if n <= 0:
+        return []
 
-    if uppercase:
-        result = result.upper()
+    buf = bytearray(os.urandom(16 * n))
+    results = []
+    for i in range(0, 16 * n, 16):
+        # 设置版本号（4）和变体位（RFC 4122）
+        buf[i + 6] = (buf[i + 6] & 0x0F) | 0x40
+        buf[i + 8] = (buf[i + 8] & 0x3F) | 0x80
+        h = binascii.hexlify(buf[i:i + 16]).decode()
+        if with_hyphen:
+            h = f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+        results.append(h.upper() if uppercase else h)
 
-    return result
+    return results
@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+"""
+JSON 编解码工具
+
+优先使用 orjson（Rust 实现），未安装时回退到 Python 标准库 json 模块。
+dumps 统一返回 UTF-8 字节，loads 同时接受 bytes 和 str。
+"""
+
+try:
+    from orjson import dumps, loads
+except ImportError:
+    import json
+    from json import loads
+
+    def dumps(data):
+        """序列化为 UTF-8 字节（与 orjson.dumps 行为一致）"""
+        return json.dumps(data, ensure_ascii=False).encode("utf-8")
@@ -21,7 +21,9 @@ AI工厂模块 - 纯参数组装
 """
 
 import os
-import json
+import copy
+import functools
+from pathlib import Path
 from typing import Optional, Dict, Any
 
 from .Model import DeepSeek
@@ -30,6 +32,33 @@ from .Model import Kimi
 from .Model import Qwen
 from .Historyfile.HistoryManager import HistHistoryManager
 from logger import logger
+from PublicTools.json_codec import loads
+
+# 供应商 -> 模型类
+_VENDORS = {
+    "deepseek": DeepSeek,
+    "doubao": Doubao,
+    "kimi": Kimi,
+    "qwen": Qwen,
+}
+
+# 已规划但暂未实现的供应商
+_UNSUPPORTED = frozenset({"chatgpt", "claude", "gemini", "xinhuo"})
+
+# 模型配置文件路径（进程内固定）
+_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "role", "config.json")
+
+
+@functools.lru_cache(maxsize=1)
+def _load_config() -> Dict[str, Any]:
+    """读取并缓存模型配置文件，进程内只解析一次"""
+    if not os.path.isfile(_CONFIG_PATH):
+        raise FileNotFoundError(f"配置文件未找到: {_CONFIG_PATH}")
+
+    # 直接解析 UTF-8 字节，省去文本解码
+    return loads(Path(_CONFIG_PATH).read_bytes())
+
+
 class AIFactory:
     """
     AI工厂类 - 纯参数组装器
@@ -110,14 +139,15 @@ class AIFactory:
         """
         从配置文件中提取模型参数
 
-        从 role/config.json 中读取指定供应商和模型的配置参数。
+        从 role/config.json 中读取指定供应商和模型的配置参数，
+        配置文件在进程内只解析一次。
 
         参数:
             vendor: 供应商名称（如 "deepseek", "qwen"）
             model_name: 模型名称（如 "deepseek-chat", "qwen-turbo"）
 
         返回:
-            包含模型配置参数的字典
+            包含模型配置参数的字典（深拷贝，修改不会影响缓存的配置）
 
         异常:
             FileNotFoundError: 配置文件不存在
@@ -134,15 +164,7 @@ class AIFactory:
                 }
             }
         """
-        # 获取当前文件所在目录，确保路径正确
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        config_path = os.path.join(script_dir, "role", "config.json")
-        
-        if not os.path.isfile(config_path):
-            raise FileNotFoundError(f"配置文件未找到: {config_path}")
-
-        with open(config_path, "r", encoding="utf-8") as f:
-            config = json.load(f)
+        config = _load_config()
 
         vendor_dict = config.get(vendor)
         if vendor_dict is None or not isinstance(vendor_dict, dict):
@@ -151,7 +173,8 @@ class AIFactory:
         params = vendor_dict.get(model_name)
         if params is None:
             raise ValueError(f"在供应商 '{vendor}' 的配置下未找到模型 '{model_name}' 的参数")
-        return params
+        # 缓存的配置在进程内共享，返回副本避免下游修改污染缓存
+        return copy.deepcopy(params)
 
     def call_model(self, vendor: str, params: Dict[str, Any]) -> Any:
         """
@@ -161,18 +184,12 @@ class AIFactory:
             vendor: 供应商名称（"deepseek", "qwen", "kimi", "doubao"）
             params: 模型配置参数字典（直接从config.json提取）
         """
-        if vendor == "deepseek":
-            return DeepSeek(params)
-        elif vendor == "doubao":
-            return Doubao(params)
-        elif vendor == "kimi":
-            return Kimi(params)
-        elif vendor == "qwen":
-            return Qwen(params)
-        elif vendor in ["chatgpt", "claude", "gemini", "xinhuo"]:
+        model_cls = _VENDORS.get(vendor)
+        if model_cls is not None:
+            return model_cls(params)
+        if vendor in _UNSUPPORTED:
             raise ValueError(f"暂不支持的供应商: {vendor}")
-        else:
-            raise ValueError(f"不支持的供应商: {vendor}")
+        raise ValueError(f"不支持的供应商: {vendor}")
 
     def gen_link_params(self) -> Dict[str, Any]:
         """
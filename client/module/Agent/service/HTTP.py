@@ -1,7 +1,43 @@
 # -*- coding: utf-8 -*-
 import httpx
-from typing import Callable
-import json
+from typing import Callable, Dict
+
+from PublicTools.json_codec import loads
+
+# 进程内共享的客户端，按 base_url 复用连接池和TLS会话
+_CLIENTS: Dict[str, httpx.AsyncClient] = {}
+_REFS: Dict[str, int] = {}
+
+
+def _lazy_loads(raw: bytes) -> Callable[[], dict]:
+    """返回按需解析 raw 的函数，首次调用时解析并缓存结果"""
+    cache = []
+
+    def parse() -> dict:
+        if not cache:
+            cache.append(loads(raw))
+        return cache[0]
+
+    return parse
+
+
+async def _aiter_raw_lines(response: httpx.Response):
+    """按行迭代响应的原始字节，不做文本解码"""
+    pending = []  # 尚未遇到换行的片段，只切分新到的数据块，避免反复扫描长行
+    async for chunk in response.aiter_bytes():
+        lines = chunk.split(b"\n")
+        if len(lines) == 1:
+            pending.append(chunk)
+            continue
+        pending.append(lines[0])
+        yield b"".join(pending).rstrip(b"\r")
+        for line in lines[1:-1]:
+            yield line.rstrip(b"\r")
+        pending = [lines[-1]]
+    tail = b"".join(pending)
+    if tail:
+        yield tail.rstrip(b"\r")
+
 
 class HTTP:
     """HTTP客户端 - 向Django服务器发送请求并接收响应"""
@@ -29,44 +65,68 @@ class HTTP:
 
         self.client = None
 
-    def connect(self):
-        """创建HTTP客户端"""
-        self.client = httpx.Client(
-            base_url=self.base_url,
-            timeout=self.timeout,
-            headers={"Content-Type": "application/json"}
-        )
+    async def connect(self):
+        """
+        获取异步HTTP客户端
+
+        同一 base_url 的所有HTTP实例共享一个客户端，启用连接池（keep-alive）
+        和 HTTP/2，多次 send() 复用同一连接，免去每次请求的 TCP/TLS 握手。
+        请求之间不要调用 close()，仅在不再通信时关闭。
+        """
+        if self.client is not None:
+            return
+
+        client = _CLIENTS.get(self.base_url)
+        if client is None:
+            client = httpx.AsyncClient(
+                base_url=self.base_url,
+                limits=httpx.Limits(
+                    max_keepalive_connections=20,
+                    max_connections=100,
+                    keepalive_expiry=30.0
+                ),
+                http2=True,
+                headers={"Content-Type": "application/json"}
+            )
+            _CLIENTS[self.base_url] = client
+        _REFS[self.base_url] = _REFS.get(self.base_url, 0) + 1
+        self.client = client
 
-    def send(self, data:dict):
+    async def send(self, data:dict):
         """
-        发送数据并等待响应
+        发送数据并异步迭代流式响应，不阻塞事件循环
 
         参数:
             data: 要发送的字典数据
             endpoint: 请求路径，默认 "/"
         返回:
-            服务器响应的字典数据
+            异步生成器，逐条产出 (raw, parse) 元组：
+                raw: 该行响应的原始 JSON 字节，可直接转发，无需重新序列化
+                parse: 无参函数，返回解析后的字典（结果缓存，多次调用只解析一次）
         """
         if self.client is None:
             raise ConnectionError("未连接，请先调用 connect()")
 
         try:
-            with self.client.stream("POST", self.endpoint, json=data) as e:
+            async with self.client.stream("POST", self.endpoint, json=data, timeout=self.timeout) as e:
                 e.raise_for_status()
-                for line in e.iter_lines():
-                    if not line:
+                async for raw in _aiter_raw_lines(e):
+                    if not raw:
                         continue
-                    msg = json.loads(line)
-                    yield msg
-                    if self.ended(msg):
+                    parse = _lazy_loads(raw)
+                    yield raw, parse
+                    if self.ended(parse()):
                         break
         except httpx.ConnectError:
             raise ConnectionError("无法连接到服务器: " + self.base_url)
         except httpx.TimeoutException:
             raise TimeoutError("请求超时，超时时间: " + str(self.timeout) + "秒")
 
-    def close(self):
-        """关闭HTTP客户端"""
+    async def close(self):
+        """释放HTTP客户端，最后一个使用者释放时才真正关闭共享客户端"""
         if self.client:
-            self.client.close()
             self.client = None
+            _REFS[self.base_url] -= 1
+            if _REFS[self.base_url] == 0:
+                del _REFS[self.base_url]
+                await _CLIENTS.pop(self.base_url).aclose()
@@ -1,12 +1,81 @@
 # -*- coding: utf-8 -*-
-import json
 import time
-import threading
-import paho.mqtt.client as mqtt
+import asyncio
+import aiomqtt
+
+from PublicTools import logger
+from PublicTools.json_codec import dumps, loads
+
+from ._shared import SharedConnection, ResponseQueue
+
+
+class _SharedMQTT(SharedConnection):
+    """
+    共享的MQTT连接
+
+    同一 (broker, port, client_id) 的所有MQTT实例共用一条 aiomqtt 连接，
+    由一个读取任务按topic把消息分发到各实例的队列，避免重复的TCP连接。
+    """
+
+    def __init__(self, key):
+        """key: (broker, port, client_id)"""
+        super().__init__(key)
+        broker, port, client_id = key
+        self.client = aiomqtt.Client(broker, port, identifier=client_id)
+        self.subscribers = []  # [(topic, ResponseQueue)]
+
+    async def _open(self):
+        try:
+            await self.client.__aenter__()
+        except aiomqtt.MqttError:
+            raise ConnectionError("无法连接到MQTT Broker: " + str(self.key[0]))
+
+    async def _close(self):
+        await self.client.__aexit__(None, None, None)
+
+    async def subscribe(self, topic, queue):
+        """登记 (topic, 队列)，该topic的消息会被放入队列"""
+        self.subscribers.append((topic, queue))
+        try:
+            await self.client.subscribe(topic)
+        except BaseException:
+            self.subscribers.remove((topic, queue))
+            raise
+
+    async def unsubscribe(self, topic, queue):
+        """注销 (topic, 队列)；连接仍可用、仍被使用且无人再订阅该topic时取消订阅"""
+        self.subscribers.remove((topic, queue))
+        if not self.closed and self.refs > 1 and all(t != topic for t, _ in self.subscribers):
+            await self.client.unsubscribe(topic)
+
+    async def _dispatch(self):
+        """读取连接上的全部消息，按topic分发"""
+        async for message in self.client.messages:
+            queues = [queue for topic, queue in self.subscribers if message.topic.matches(topic)]
+            if not queues:
+                continue
+            # 单条坏消息只丢弃自身，不能让读取任务退出
+            try:
+                data = loads(message.payload)
+            except ValueError:
+                logger.warning(f"丢弃无法解析的MQTT消息: {message.topic}")
+                continue
+            for queue in queues:
+                queue.offer(data)
+
+    def _fail(self):
+        """连接断开，通知所有订阅者"""
+        error = ConnectionError("MQTT连接已断开: " + str(self.key[0]))
+        for _, queue in self.subscribers:
+            queue.fail(error)
 
 
 class MQTT:
-    """MQTT客户端 - 通过发布/订阅与Django服务器通信"""
+    """
+    MQTT客户端 - 通过发布/订阅与Django服务器通信（基于asyncio，无后台线程）
+
+    连接相同Broker的实例共享同一条连接，各自按response_topic接收消息。
+    """
 
     def __init__(self, broker, port=1883, client_id=None,
                  request_topic="agent/request", response_topic="agent/response",
@@ -19,7 +88,7 @@ class MQTT:
             request_topic: 发送请求的topic
             response_topic: 接收响应的topic
             callback: 流式结束判断回调，接收dict返回bool，True表示结束
-            timeout: 等待响应超时时间（秒）
+            timeout: 等待响应超时时间（秒）；流式接收时为相邻两条消息的最大间隔
         """
         self.broker = broker
         self.port = port
@@ -29,67 +98,86 @@ class MQTT:
         self.callback = callback
         self.timeout = timeout
         self.client = None
-        self.messages = []  # 响应消息数组
-        self._lock = threading.Lock()
-
-    def _on_message(self, client, userdata, msg):
-        """收到消息的回调，存入数组"""
-        data = json.loads(msg.payload.decode("utf-8"))
-        with self._lock:
-            self.messages.append(data)
-
-    def connect(self):
-        """连接Broker并订阅响应topic"""
-        self.client = mqtt.Client(client_id=self.client_id)
-        self.client.on_message = self._on_message
-        self.client.connect(self.broker, self.port)
-        self.client.subscribe(self.response_topic)
-        self.client.loop_start()
-
-    def send(self, data):
+        self.messages = None  # 响应消息队列（有界），由共享连接写入
+        self._shared = None
+
+    async def connect(self):
+        """连接Broker（复用共享连接）并订阅响应topic"""
+        if self.client is not None:
+            return
+
+        self._shared = await _SharedMQTT.acquire((self.broker, self.port, self.client_id))
+        self.messages = ResponseQueue("MQTT " + self.response_topic)
+        try:
+            await self._shared.subscribe(self.response_topic, self.messages)
+        except BaseException:
+            await self._shared.release()
+            self._shared = None
+            raise
+        self.client = self._shared.client
+
+    @staticmethod
+    def precompile_payload(data):
+        """
+        预先序列化消息，返回可直接传给 send() 的字节
+
+        适用于反复发送的固定消息（如心跳），避免每次发送都重新编码。
+        """
+        return dumps(data)
+
+    async def send(self, data):
         """
         发布消息并等待响应
 
         参数:
-            data: 要发送的字典数据
+            data: 要发送的字典数据，或 precompile_payload() 生成的字节
         返回:
             无callback: 单条响应dict
-            有callback: 收集全部消息的列表
+            有callback: 异步生成器，逐条产出消息，callback返回True后结束
+
+        send() 本身是协程，调用时立即发布请求；有callback时需先 await 拿到
+        生成器再迭代，即 ``async for msg in await mqtt.send(data)``。
+        产出的是解析后的dict，不同于 HTTP.send 的 (raw, parse)。
         """
         if self.client is None:
             raise ConnectionError("未连接，请先调用 connect()")
 
-        self.client.publish(
-            self.request_topic,
-            json.dumps(data, ensure_ascii=False)
-        )
-        # 轮询数组等待响应
-        start = time.time()
+        payload = data if isinstance(data, (bytes, bytearray)) else dumps(data)
+        await self.client.publish(self.request_topic, payload)
+        # 在事件循环上等待响应，直到超时
+        deadline = time.monotonic() + self.timeout
         if self.callback is None:
-            while True:
-                with self._lock:
-                    if self.messages:
-                        return self.messages.pop(0)
-                if time.time() - start > self.timeout:
-                    raise TimeoutError("等待MQTT响应超时")
-                time.sleep(0.01)
-
-        # 流式接收，直到callback返回True
-        results = []
+            return await self._get(deadline)
+
+        return self._stream(deadline)
+
+    async def _stream(self, deadline):
+        """流式接收，逐条产出消息，直到callback返回True"""
         while True:
-            with self._lock:
-                if self.messages:
-                    msg = self.messages.pop(0)
-                    results.append(msg)
-                    if self.callback(msg):
-                        return results
-            if time.time() - start > self.timeout:
-                raise TimeoutError("等待MQTT响应超时")
-            time.sleep(0.01)
-
-    def close(self):
-        """断开MQTT连接"""
+            msg = await self._get(deadline)
+            yield msg
+            if self.callback(msg):
+                return
+            # 超时按消息间隔计算，总时长不受限
+            deadline = time.monotonic() + self.timeout
+
+    async def _get(self, deadline):
+        """接收一条响应消息，超过deadline抛出TimeoutError"""
+        try:
+            return await asyncio.wait_for(
+                self.messages.take(),
+                max(deadline - time.monotonic(), 0)
+            )
+        except asyncio.TimeoutError:
+            raise TimeoutError("等待MQTT响应超时")
+
+    async def close(self):
+        """断开MQTT连接（共享连接在最后一个实例关闭时才真正断开）"""
         if self.client:
-            self.client.loop_stop()
-            self.client.disconnect()
-            self.client = None
+            try:
+                await self._shared.unsubscribe(self.response_topic, self.messages)
+            finally:
+                # 取消订阅失败（如 MqttError）也要归还引用，避免共享连接泄漏
+                await self._shared.release()
+                self.client = None
+                self._shared = None
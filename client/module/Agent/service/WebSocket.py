@@ -1,54 +1,158 @@
 # -*- coding: utf-8 -*-
-import json
-from websockets.sync.client import connect
+import time
+import weakref
+import asyncio
+from websockets.asyncio.client import connect
+from websockets.exceptions import ConnectionClosed
+
+from PublicTools import generate_id, logger
+from PublicTools.json_codec import dumps, loads
+
+from ._shared import SharedConnection, ResponseQueue
+
+
+class _SharedWebSocket(SharedConnection):
+    """
+    共享的WebSocket连接
+
+    同一URL的所有WebSocket实例共用一条连接。每个请求携带 request_id，
+    由一个读取任务按 request_id 把响应分发到对应请求的队列。
+    """
+
+    def __init__(self, url):
+        super().__init__(url)
+        self.url = url
+        self.ws = None
+        self.inflight = {}  # request_id -> ResponseQueue
+
+    async def _open(self):
+        # 启用permessage-deflate压缩，不限制单条消息大小
+        self.ws = await connect(self.url, compression="deflate", max_size=None)
+
+    async def _close(self):
+        await self.ws.close()
+
+    async def _dispatch(self):
+        """读取连接上的全部消息，按 request_id 分发"""
+        try:
+            async for raw in self.ws:
+                # 单帧坏数据只丢弃自身，不能让读取任务退出
+                try:
+                    msg = loads(raw)
+                    request_id = msg["request_id"]
+                    queue = self.inflight.get(request_id)
+                except Exception as e:
+                    logger.warning(f"丢弃无法解析的WebSocket消息: {e!r}")
+                    continue
+                if queue is None:
+                    logger.warning(f"丢弃无对应请求的WebSocket消息: {request_id}")
+                    continue
+                queue.offer(msg)
+        except ConnectionClosed:
+            pass
+
+    def _fail(self):
+        """连接已断开，唤醒所有仍在等待的请求"""
+        error = ConnectionError("WebSocket连接已断开: " + self.url)
+        for queue in self.inflight.values():
+            queue.fail(error)
 
 
 class WebSocket:
-    """WebSocket客户端 - 与Django服务器建立长连接"""
+    """
+    WebSocket客户端 - 与Django服务器建立长连接
+
+    连接相同URL的实例共享同一条连接，请求通过 request_id 关联响应：
+    请求数据必须是dict，发送时会附加 request_id 字段（调用方不能自带该字段），
+    服务器需在响应中原样带回 request_id。
+    """
 
-    def __init__(self, url, callback=None):
+    def __init__(self, url, callback=None, timeout=30):
         """
         参数:
             url: WebSocket地址，如 "ws://127.0.0.1:8000/ws"
             callback: 流式结束判断回调，接收dict返回bool，True表示结束
+            timeout: 等待响应超时时间（秒）；流式接收时为相邻两条消息的最大间隔
         """
         self.url = url
         self.ws = None
         self.callback = callback
+        self.timeout = timeout
+        self._shared = None
 
-    def connect(self):
-        """建立WebSocket连接"""
-        self.ws = connect(self.url)
+    async def connect(self):
+        """建立WebSocket连接（复用共享连接）"""
+        if self.ws is not None:
+            return
 
-    def send(self, data):
+        self._shared = await _SharedWebSocket.acquire(self.url)
+        self.ws = self._shared.ws
+
+    async def send(self, data):
         """
         发送数据并等待响应
 
         参数:
-            data: 要发送的字典数据
+            data: 要发送的字典数据，发送时附加 request_id 字段
         返回:
             无callback: 单条响应dict
-            有callback: 收集全部消息的列表
+            有callback: 异步生成器，逐条产出消息，callback返回True后结束
+
+        send() 本身是协程，调用时立即发送请求；有callback时需先 await 拿到
+        生成器再迭代，即 ``async for msg in await ws.send(data)``。
+        产出的是解析后的dict，不同于 HTTP.send 的 (raw, parse)。
         """
         if self.ws is None:
             raise ConnectionError("未连接，请先调用 connect()")
+        if "request_id" in data:
+            raise ValueError("request_id 由客户端生成，data 中不能包含该字段")
 
-        self.ws.send(json.dumps(data, ensure_ascii=False))
+        request_id = generate_id(with_hyphen=False)
+        queue = ResponseQueue("WebSocket " + self.url)
+        self._shared.inflight[request_id] = queue
+        deadline = time.monotonic() + self.timeout
+
+        try:
+            # text=True：以文本帧发送 UTF-8 字节，与原 str 发送行为一致
+            await self.ws.send(dumps({**data, "request_id": request_id}), text=True)
+        except BaseException:
+            self._shared.inflight.pop(request_id, None)
+            raise
 
         if self.callback is None:
-            response = self.ws.recv()
-            return json.loads(response)
-
-        # 流式接收，直到callback返回True
-        results = []
-        while True:
-            response = json.loads(self.ws.recv())
-            results.append(response)
-            if self.callback(response):
-                return results
-
-    def close(self):
-        """断开WebSocket连接"""
+            try:
+                return await self._get(queue, deadline)
+            finally:
+                self._shared.inflight.pop(request_id, None)
+
+        stream = self._stream(request_id, queue, deadline)
+        # 调用方未迭代就丢弃生成器时，finally 不会执行，由 finalize 兜底注销
+        weakref.finalize(stream, self._shared.inflight.pop, request_id, None)
+        return stream
+
+    async def _stream(self, request_id, queue, deadline):
+        """流式接收，逐条产出消息，直到callback返回True"""
+        try:
+            while True:
+                msg = await self._get(queue, deadline)
+                yield msg
+                if self.callback(msg):
+                    return
+                # 超时按消息间隔计算，总时长不受限
+                deadline = time.monotonic() + self.timeout
+        finally:
+            self._shared.inflight.pop(request_id, None)
+
+    async def _get(self, queue, deadline):
+        """接收一条响应消息，超过deadline抛出TimeoutError"""
+        try:
+            return await asyncio.wait_for(queue.take(), max(deadline - time.monotonic(), 0))
+        except asyncio.TimeoutError:
+            raise TimeoutError("等待WebSocket响应超时")
+
+    async def close(self):
+        """断开WebSocket连接（共享连接在最后一个实例关闭时才真正断开）"""
         if self.ws:
-            self.ws.close()
+            await self._shared.release()
             self.ws = None
+            self._shared = None
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+共享连接基类
+
+相同 key 的多个客户端实例共用一条底层连接，按引用计数管理生命周期，
+由一个读取任务把收到的消息分发给各使用者。
+"""
+import asyncio
+from abc import ABC, abstractmethod
+
+from PublicTools import logger
+
+# 每个响应队列最多缓存的未读消息数，超出后丢弃新消息
+MAX_QUEUED = 4096
+
+
+class ResponseQueue(asyncio.Queue):
+    """
+    响应队列
+
+    有界队列，满时丢弃新消息（每次溢出只告警一次）；
+    连接断开后通过 fail() 让等待方收到异常。
+    """
+
+    def __init__(self, name, maxsize=MAX_QUEUED):
+        """
+        参数:
+            name: 队列名称，用于日志
+            maxsize: 最多缓存的未读消息数
+        """
+        super().__init__(maxsize)
+        self.name = name
+        self.error = None
+        self.dropped = 0  # 本次溢出已丢弃的消息数，0 表示未处于溢出状态
+
+    def offer(self, item):
+        """非阻塞放入一条消息，队列已满时丢弃"""
+        try:
+            self.put_nowait(item)
+        except asyncio.QueueFull:
+            if self.dropped == 0:
+                logger.warning(f"{self.name} 响应队列已满，开始丢弃消息")
+            self.dropped += 1
+            return
+
+        # 消费方已腾出空间，本次溢出结束
+        if self.dropped:
+            logger.warning(f"{self.name} 响应队列恢复，本次共丢弃 {self.dropped} 条消息")
+            self.dropped = 0
+
+    def fail(self, error):
+        """标记连接已断开；已缓存的消息取完后，take() 抛出 error"""
+        self.error = error
+        try:
+            self.put_nowait(error)
+        except asyncio.QueueFull:
+            pass  # 队列非空，取空后由 take() 抛出
+
+    async def take(self):
+        """取出一条消息；连接已断开且无剩余消息时抛出对应异常"""
+        if self.error is not None and self.empty():
+            raise self.error
+        item = await self.get()
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+
+class SharedConnection(ABC):
+    """
+    共享连接基类
+
+    子类实现:
+        _open(): 建立底层连接
+        _close(): 断开底层连接
+        _dispatch(): 读取并分发消息（作为后台任务运行）
+        _fail(): 连接意外断开时通知所有使用者
+    """
+
+    _instances = None  # key -> 共享连接，由 __init_subclass__ 为每个子类创建
+    _locks = None      # key -> asyncio.Lock，按 key 保护连接的创建与释放
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._instances = {}
+        cls._locks = {}
+
+    def __init__(self, key):
+        self.key = key
+        self.refs = 0
+        self.closed = False
+        self._reader = None
+
+    @classmethod
+    async def acquire(cls, key):
+        """获取（必要时创建）共享连接，引用计数加一"""
+        # 每个 key 一把锁，建立连接的握手不阻塞其他 key
+        async with cls._locks.setdefault(key, asyncio.Lock()):
+            shared = cls._instances.get(key)
+            if shared is None:
+                shared = cls(key)
+                await shared._open()
+                shared._reader = asyncio.create_task(shared._run())
+                cls._instances[key] = shared
+            shared.refs += 1
+            return shared
+
+    async def release(self):
+        """引用计数减一；最后一个使用者释放时断开连接"""
+        async with self._locks[self.key]:
+            self.refs -= 1
+            if self.refs > 0:
+                return
+
+            self._evict()
+            if not self.closed:
+                self.closed = True
+                self._reader.cancel()
+                await self._close()
+
+    def _evict(self):
+        """从共享表中移除自身（表中已是新连接时不动）"""
+        if self._instances.get(self.key) is self:
+            del self._instances[self.key]
+
+    async def _run(self):
+        """运行读取任务；意外退出时移出共享表，下次 acquire 会重新连接"""
+        try:
+            await self._dispatch()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"共享连接读取任务异常退出: {self.key}: {e!r}")
+
+        self.closed = True
+        self._evict()
+        self._fail()
+        try:
+            await self._close()
+        except Exception as e:
+            logger.warning(f"关闭已断开的共享连接失败: {self.key}: {e!r}")
+
+    @abstractmethod
+    async def _open(self):
+        """建立底层连接"""
+
+    @abstractmethod
+    async def _close(self):
+        """断开底层连接"""
+
+    @abstractmethod
+    async def _dispatch(self):
+        """读取并分发消息，连接断开时返回"""
+
+    @abstractmethod
+    def _fail(self):
+        """连接意外断开时通知所有使用者"""
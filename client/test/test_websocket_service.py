@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+测试 WebSocket 服务的共享连接（坏帧容错与断线重连）
+
+在本地启动一个 websockets 服务器，按 request_id 回显请求：
+    - 请求带 "bad": 先发送若干无法解析/无法路由的帧，再正常回显
+    - 请求带 "drop": 直接断开连接
+    - 请求带 "stream": 按 "gap" 秒的间隔分多条回复，最后一条带 "done"
+"""
+import sys
+import os
+import json
+import asyncio
+
+# 添加父目录到路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from websockets.asyncio.server import serve
+
+from module.Agent.service.WebSocket import WebSocket, _SharedWebSocket
+
+
+async def _handler(ws):
+    """测试服务器：按 request_id 回显"""
+    async for raw in ws:
+        data = json.loads(raw)
+        if data.get("drop"):
+            await ws.close()
+            return
+        if data.get("stream"):
+            for i in range(data["stream"]):
+                await asyncio.sleep(data["gap"])
+                await ws.send(json.dumps({
+                    "request_id": data["request_id"],
+                    "index": i,
+                    "done": i == data["stream"] - 1,
+                }))
+            continue
+        if data.get("bad"):
+            for frame in ("not json", "[1, 2]", '"text"', '{"no_id": 1}', '{"request_id": [1]}'):
+                await ws.send(frame)
+        await ws.send(json.dumps({"request_id": data["request_id"], "echo": data.get("value")}))
+
+
+async def _with_server(body):
+    async with serve(_handler, "127.0.0.1", 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        await body("ws://127.0.0.1:%d" % port)
+
+
+def test_bad_frame_does_not_kill_reader():
+    """坏帧只被丢弃，同一连接上的后续请求正常返回"""
+    async def body(url):
+        client = WebSocket(url, timeout=5)
+        await client.connect()
+        try:
+            response = await client.send({"bad": True, "value": 1})
+            assert response["echo"] == 1
+
+            response = await client.send({"value": 2})
+            assert response["echo"] == 2
+            assert not client._shared.inflight
+        finally:
+            await client.close()
+
+    asyncio.run(_with_server(body))
+
+
+def test_reconnect_after_drop():
+    """连接断开时等待方收到 ConnectionError，新实例会重新连接"""
+    async def body(url):
+        old = WebSocket(url, timeout=5)
+        await old.connect()
+        try:
+            try:
+                await old.send({"drop": True})
+                assert False, "断线后应抛出 ConnectionError"
+            except ConnectionError:
+                pass
+
+            # 读取任务退出后，断开的连接已移出共享表
+            await asyncio.sleep(0)
+            assert url not in _SharedWebSocket._instances
+
+            new = WebSocket(url, timeout=5)
+            await new.connect()
+            try:
+                assert new.ws is not old.ws
+                response = await new.send({"value": 3})
+                assert response["echo"] == 3
+            finally:
+                await new.close()
+        finally:
+            await old.close()
+
+        assert url not in _SharedWebSocket._instances
+
+    asyncio.run(_with_server(body))
+
+
+def test_stream_longer_than_timeout():
+    """流式回复总时长超过 timeout，只要相邻消息间隔不超时就能收完"""
+    async def body(url):
+        client = WebSocket(url, callback=lambda msg: msg["done"], timeout=0.5)
+        await client.connect()
+        try:
+            indexes = []
+            async for msg in await client.send({"stream": 6, "gap": 0.2}):
+                indexes.append(msg["index"])
+            assert indexes == list(range(6))
+            assert not client._shared.inflight
+        finally:
+            await client.close()
+
+    asyncio.run(_with_server(body))
+
+
+if __name__ == "__main__":
+    test_bad_frame_does_not_kill_reader()
+    print("[PASS] 坏帧容错")
+    test_reconnect_after_drop()
+    print("[PASS] 断线重连")
+    test_stream_longer_than_timeout()
+    print("[PASS] 长时间流式回复")